@@ -1,20 +1,23 @@
 from __future__ import annotations
 
 import os
-import re
 import sys
 from datetime import date, datetime, timedelta
-from typing import Dict, List
+from typing import Callable, Dict, List
 
 from flask import (
     Flask,
     abort,
+    g,
     jsonify,
     render_template,
     request,
     session,
 )
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import case, event, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import selectinload
 
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
@@ -28,22 +31,65 @@ app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
 db = SQLAlchemy(app)
 
-def _ensure_sqlite_columns() -> None:
+SCHEMA_MARKER = "cols_v2"
+
+
+def _ensure_sqlite_columns(force: bool = False) -> None:
     try:
         if not os.path.exists(DB_PATH):
             return
-        import sqlite3
-        con = sqlite3.connect(DB_PATH)
-        cols = {row[1] for row in con.execute("PRAGMA table_info(task)").fetchall()}
-        if "started_at" not in cols:
-            con.execute("ALTER TABLE task ADD COLUMN started_at DATE")
-        if "completed_at" not in cols:
-            con.execute("ALTER TABLE task ADD COLUMN completed_at DATE")
-        con.commit()
-        con.close()
+        with db.engine.begin() as con:
+            if not force:
+                try:
+                    if con.exec_driver_sql(
+                        "SELECT v FROM _schema_meta WHERE k = ?", (SCHEMA_MARKER,)
+                    ).scalar():
+                        return
+                except OperationalError:
+                    pass
+            cols = {
+                row[1] for row in con.exec_driver_sql("PRAGMA table_info(task)")
+            }
+            if "started_at" not in cols:
+                con.exec_driver_sql("ALTER TABLE task ADD COLUMN started_at DATE")
+            if "completed_at" not in cols:
+                con.exec_driver_sql("ALTER TABLE task ADD COLUMN completed_at DATE")
+            con.exec_driver_sql(
+                "CREATE INDEX IF NOT EXISTS ix_task_week_priority "
+                "ON task (week, priority)"
+            )
+            con.exec_driver_sql(
+                "CREATE INDEX IF NOT EXISTS ix_subtask_task_done "
+                "ON subtask (task_id, done)"
+            )
+            con.exec_driver_sql(
+                "CREATE INDEX IF NOT EXISTS ix_dep_dependson_task "
+                "ON dependency (depends_on_id, task_id)"
+            )
+            # Leading prefixes of the composite indexes above.
+            con.exec_driver_sql("DROP INDEX IF EXISTS ix_task_week")
+            con.exec_driver_sql("DROP INDEX IF EXISTS ix_subtask_task_id")
+            con.exec_driver_sql("DROP INDEX IF EXISTS ix_dependency_depends_on_id")
+            con.exec_driver_sql(
+                "CREATE TABLE IF NOT EXISTS _schema_meta "
+                "(k TEXT PRIMARY KEY, v TEXT)"
+            )
+            con.exec_driver_sql(
+                "INSERT OR REPLACE INTO _schema_meta VALUES (?, '1')",
+                (SCHEMA_MARKER,),
+            )
     except Exception:
         pass
 
+def _set_sqlite_pragmas(dbapi_conn, _record) -> None:
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA foreign_keys=ON")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA mmap_size=134217728")
+    cur.close()
+
 @app.teardown_appcontext
 def shutdown_session(exception: Exception | None = None):
     db.session.remove()
@@ -52,6 +98,7 @@ def shutdown_session(exception: Exception | None = None):
 # Models
 class Task(db.Model):
     __tablename__ = "task"
+    __table_args__ = (db.Index("ix_task_week_priority", "week", "priority"),)
 
     id = db.Column(db.Integer, primary_key=True)
     slug = db.Column(db.String(255), unique=True, index=True)
@@ -61,7 +108,7 @@ class Task(db.Model):
         db.String(20), nullable=False, default="todo", index=True
     )
     priority = db.Column(db.Integer, default=2)
-    week = db.Column(db.Integer, index=True)
+    week = db.Column(db.Integer)
     start_date = db.Column(db.Date)
     end_date = db.Column(db.Date)
     started_at = db.Column(db.Date)
@@ -73,53 +120,55 @@ class Task(db.Model):
     )
 
     subtasks = db.relationship(
-        "Subtask", backref="task", cascade="all, delete-orphan", lazy="dynamic"
+        "Subtask",
+        backref="task",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="Subtask.id",
     )
     dependencies = db.relationship(
         "Dependency",
         foreign_keys="Dependency.task_id",
         backref="task",
         cascade="all, delete-orphan",
-        lazy="dynamic",
+        passive_deletes=True,
     )
     dependents = db.relationship(
         "Dependency",
         foreign_keys="Dependency.depends_on_id",
         backref="depends_on_task",
         cascade="all, delete-orphan",
-        lazy="dynamic",
+        passive_deletes=True,
     )
 
     def as_dict(self) -> Dict:
-        return {
-            "id": self.id,
-            "slug": self.slug,
-            "title": self.title,
-            "description": self.description,
-            "status": self.status,
-            "priority": self.priority,
-            "week": self.week,
-            "start_date": self.start_date.isoformat()
-            if self.start_date
-            else None,
-            "end_date": self.end_date.isoformat() if self.end_date else None,
-            "started_at": self.started_at.isoformat()
-            if self.started_at
-            else None,
-            "completed_at": self.completed_at.isoformat()
-            if self.completed_at
-            else None,
-            "progress": self.progress,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
-        }
+        return _task_dict(self)
+
+
+TASK_COLS = (
+    Task.id,
+    Task.slug,
+    Task.title,
+    Task.description,
+    Task.status,
+    Task.priority,
+    Task.week,
+    Task.start_date,
+    Task.end_date,
+    Task.started_at,
+    Task.completed_at,
+    Task.progress,
+    Task.created_at,
+    Task.updated_at,
+)
 
 
 class Subtask(db.Model):
     __tablename__ = "subtask"
+    __table_args__ = (db.Index("ix_subtask_task_done", "task_id", "done"),)
 
     id = db.Column(db.Integer, primary_key=True)
-    task_id = db.Column(db.Integer, db.ForeignKey("task.id"), index=True)
+    task_id = db.Column(db.Integer, db.ForeignKey("task.id", ondelete="CASCADE"))
     title = db.Column(db.String(255), nullable=False)
     done = db.Column(db.Boolean, default=False)
 
@@ -134,10 +183,17 @@ class Subtask(db.Model):
 
 class Dependency(db.Model):
     __tablename__ = "dependency"
+    __table_args__ = (
+        db.Index("ix_dep_dependson_task", "depends_on_id", "task_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    task_id = db.Column(db.Integer, db.ForeignKey("task.id"), index=True)
-    depends_on_id = db.Column(db.Integer, db.ForeignKey("task.id"), index=True)
+    task_id = db.Column(
+        db.Integer, db.ForeignKey("task.id", ondelete="CASCADE"), index=True
+    )
+    depends_on_id = db.Column(
+        db.Integer, db.ForeignKey("task.id", ondelete="CASCADE")
+    )
 
     def as_dict(self) -> Dict:
         return {
@@ -148,10 +204,44 @@ class Dependency(db.Model):
 
 
 # Helpers
+def _iso(d: date | None, _fmt=date.isoformat) -> str | None:
+    return _fmt(d) if d is not None else None
+
+
+def _iso_dt(d: datetime | None, _fmt=datetime.isoformat) -> str | None:
+    return _fmt(d) if d is not None else None
+
+
+def _task_dict(r) -> Dict:
+    """Serialise a Task or a row selected with TASK_COLS."""
+    return {
+        "id": r.id,
+        "slug": r.slug,
+        "title": r.title,
+        "description": r.description,
+        "status": r.status,
+        "priority": r.priority,
+        "week": r.week,
+        "start_date": _iso(r.start_date),
+        "end_date": _iso(r.end_date),
+        "started_at": _iso(r.started_at),
+        "completed_at": _iso(r.completed_at),
+        "progress": r.progress,
+        "created_at": _iso_dt(r.created_at),
+        "updated_at": _iso_dt(r.updated_at),
+    }
+
+
+# Byte table mapping [a-z0-9] to itself and every other byte to a space, so
+# bytes.split() collapses and strips the separator runs in one pass.
+_SLUG_TABLE = bytes(
+    c if (48 <= c <= 57 or 97 <= c <= 122) else 32 for c in range(256)
+)
+
+
 def slugify(s: str) -> str:
-    s = s.lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s).strip("-")
-    return s or "task"
+    b = s.lower().encode("ascii", "replace").translate(_SLUG_TABLE)
+    return b"-".join(b.split()).decode() or "task"
 
 
 def ensure_csrf():
@@ -171,71 +261,135 @@ def _init_csrf():
             abort(400, description="CSRF validation failed")
 
 
+def _today() -> date:
+    """Today's date, resolved once per request."""
+    if "_today" not in g:
+        g._today = date.today()
+    return g._today
+
+
 @app.context_processor
 def inject_globals():
     return {
         "csrf_token": ensure_csrf(),
-        "today": date.today(),
+        "today": _today(),
         "Subtask": Subtask,
         "Task": Task,
     }
 
 
 def compute_task_progress(t: Task) -> float:
-    total = t.subtasks.count()
+    total, done = (
+        db.session.query(
+            func.count(Subtask.id),
+            func.coalesce(func.sum(case((Subtask.done, 1), else_=0)), 0),
+        )
+        .filter(Subtask.task_id == t.id)
+        .one()
+    )
+    if total == 0:
+        return 100.0 if t.status == "done" else 0.0
+    return round(100.0 * (done / total), 1)
+
+
+def subtask_progress(t: Task) -> float:
+    """Like compute_task_progress, but from the loaded subtasks collection."""
+    total = len(t.subtasks)
     if total == 0:
         return 100.0 if t.status == "done" else 0.0
-    done = t.subtasks.filter_by(done=True).count()
+    done = sum(1 for st in t.subtasks if st.done)
     return round(100.0 * (done / total), 1)
 
 
 def has_blocking_dependencies(t: Task) -> bool:
-    deps = t.dependencies.all()
-    if not deps:
-        return False
-    dep_task_ids = [d.depends_on_id for d in deps]
-    if not dep_task_ids:
-        return False
-    q = Task.query.filter(Task.id.in_(dep_task_ids)).all()
-    return any(x.status != "done" for x in q)
-
-
-def enforce_blocking_status(t: Task) -> None:
-    if t.status != "done" and has_blocking_dependencies(t):
+    # Memoized per request; routes that change dependencies drop the cache.
+    cache = g.setdefault("_blk_cache", {})
+    if t.id in cache:
+        return cache[t.id]
+    blocking = (
+        db.session.query(Dependency)
+        .join(Task, Task.id == Dependency.depends_on_id)
+        .filter(Dependency.task_id == t.id, Task.status != "done")
+        .exists()
+    )
+    cache[t.id] = result = bool(db.session.query(blocking).scalar())
+    return result
+
+
+def enforce_blocking_status(
+    t: Task, prereq_done: Callable[[int], bool] | None = None
+) -> None:
+    """Block/unblock t; with prereq_done, checks loaded t.dependencies in memory."""
+    if t.status == "done":
+        return
+    if prereq_done is None:
+        blocked = has_blocking_dependencies(t)
+    else:
+        blocked = not all(prereq_done(d.depends_on_id) for d in t.dependencies)
+    if blocked:
         t.status = "blocked"
-    elif t.status == "blocked" and not has_blocking_dependencies(t):
+    elif t.status == "blocked":
         t.status = "in_progress" if t.progress > 0 else "todo"
 
 
-def update_dependents_status(changed_task_id: int) -> None:
-    deps = Dependency.query.filter_by(depends_on_id=changed_task_id).all()
-    for dep in deps:
-        dt = Task.query.get(dep.task_id)
-        if not dt:
-            continue
-        dt.progress = compute_task_progress(dt)
-        if has_blocking_dependencies(dt):
-            if dt.status != "done":
-                dt.status = "blocked"
-        else:
-            if dt.status == "blocked":
-                if dt.progress == 100.0:
-                    dt.status = "done"
-                elif dt.progress > 0.0:
-                    dt.status = "in_progress"
-                else:
-                    dt.status = "todo"
-    db.session.commit()
+def loaded_prereq_done(tasks: List[Task]) -> Callable[[int], bool]:
+    """prereq_done predicate for tasks with loaded dependencies (one query)."""
+    dep_ids = {d.depends_on_id for t in tasks for d in t.dependencies}
+    status_by_id = (
+        dict(
+            db.session.query(Task.id, Task.status)
+            .filter(Task.id.in_(dep_ids))
+            .all()
+        )
+        if dep_ids
+        else {}
+    )
+    return lambda dep_id: status_by_id.get(dep_id, "done") == "done"
+
+
+def update_dependents_status(
+    changed_task_id: int, old_status: str, new_status: str
+) -> None:
+    # Dependents only care whether the changed task is done.
+    if (old_status == "done") == (new_status == "done"):
+        return
+    g.pop("_blk_cache", None)
+    dependents = (
+        Task.query.options(
+            selectinload(Task.subtasks), selectinload(Task.dependencies)
+        )
+        .join(Dependency, Dependency.task_id == Task.id)
+        .filter(Dependency.depends_on_id == changed_task_id)
+        .all()
+    )
+    prereq_done = loaded_prereq_done(dependents)
+    for dt in dependents:
+        dt.progress = subtask_progress(dt)
+        was_blocked = dt.status == "blocked"
+        enforce_blocking_status(dt, prereq_done)
+        # A dependent unblocked with every subtask done is finished.
+        if was_blocked and dt.status != "blocked" and dt.progress == 100.0:
+            dt.status = "done"
+            if not dt.completed_at:
+                dt.completed_at = _today()
+
+
+def week_dates(week: int | None, start_date: date) -> tuple[date, date] | None:
+    if week and week > 0:
+        start = start_date + timedelta(days=(week - 1) * 7)
+        return start, start + timedelta(days=6)
+    return None
 
 
 def set_dates_for_week(t: Task, start_date: date) -> None:
-    if t.week and t.week > 0:
-        offset = (t.week - 1) * 7
-        t.start_date = start_date + timedelta(days=offset)
-        t.end_date = t.start_date + timedelta(days=6)
+    dates = week_dates(t.week, start_date)
+    if dates:
+        t.start_date, t.end_date = dates
 
 def _ensure_columns_on_startup() -> None:
-    _ensure_sqlite_columns()
+    with app.app_context():
+        event.listen(db.engine, "connect", _set_sqlite_pragmas)
+        _ensure_sqlite_columns()
 
 _ensure_columns_on_startup()
 
@@ -243,7 +397,11 @@ _ensure_columns_on_startup()
 # Routes: pages
 @app.route("/")
 def index():
-    tasks = Task.query.order_by(Task.week.asc(), Task.priority.asc()).all()
+    tasks = (
+        Task.query.options(selectinload(Task.subtasks))
+        .order_by(Task.week.asc(), Task.priority.asc())
+        .all()
+    )
     weeks: Dict[int, List[Task]] = {}
     for t in tasks:
         weeks.setdefault(t.week or 0, []).append(t)
@@ -257,7 +415,7 @@ def calendar():
 
 @app.route("/tasks/<int:task_id>")
 def task_detail(task_id: int):
-    t = Task.query.get_or_404(task_id)
+    t = db.get_or_404(Task, task_id)
     deps = (
         db.session.query(Dependency, Task)
         .join(Task, Dependency.depends_on_id == Task.id)
@@ -287,8 +445,11 @@ def graph_page():
 @app.route("/api/tasks", methods=["GET", "POST"])
 def api_tasks():
     if request.method == "GET":
-        tasks = Task.query.order_by(Task.week.asc(), Task.priority.asc()).all()
-        return jsonify({"ok": True, "tasks": [t.as_dict() for t in tasks]})
+        rows = db.session.execute(
+            select(*TASK_COLS).order_by(Task.week.asc(), Task.priority.asc())
+        ).all()
+        tasks = [_task_dict(r) for r in rows]
+        return jsonify({"ok": True, "tasks": tasks})
     data = request.get_json(force=True, silent=True) or {}
     title = (data.get("title") or "").strip()
     if not title:
@@ -302,7 +463,7 @@ def api_tasks():
     t.slug = slugify(title)
     set_dates_for_week(t, DEFAULT_START_DATE)
     db.session.add(t)
-    db.session.commit()
+    db.session.flush()
     t.progress = compute_task_progress(t)
     enforce_blocking_status(t)
     db.session.commit()
@@ -319,43 +480,50 @@ def api_get_dependents(task_id: int):
 
 @app.route("/api/tasks/<int:task_id>/status", methods=["POST"])
 def api_update_task_status(task_id: int):
-    t = Task.query.get_or_404(task_id)
+    t = db.get_or_404(Task, task_id)
     data = request.get_json(force=True, silent=True) or {}
     new_status = data.get("status")
     if new_status not in ("todo", "in_progress", "done"):
         abort(400, description="invalid status")
 
+    old_status = t.status
     if new_status == "done":
         if has_blocking_dependencies(t):
             abort(400, description="Task has incomplete dependencies")
-        for st in t.subtasks.all():
-            st.done = True
+        db.session.query(Subtask).filter(Subtask.task_id == t.id).update(
+            {Subtask.done: True}, synchronize_session=False
+        )
         t.status = "done"
         if not t.completed_at:
-            t.completed_at = date.today()
+            t.completed_at = _today()
         if not t.started_at:
-            t.started_at = date.today()
+            t.started_at = _today()
     elif new_status == "todo":
-        for st in t.subtasks.all():
-            st.done = False
+        db.session.query(Subtask).filter(Subtask.task_id == t.id).update(
+            {Subtask.done: False}, synchronize_session=False
+        )
         t.status = "todo"
         t.completed_at = None
     else:
         t.status = "in_progress"
         if not t.started_at:
-            t.started_at = date.today()
+            t.started_at = _today()
 
-    db.session.commit()
+    db.session.flush()
     t.progress = compute_task_progress(t)
     enforce_blocking_status(t)
+    update_dependents_status(t.id, old_status, t.status)
     db.session.commit()
-    update_dependents_status(t.id)
     return jsonify({"ok": True, "task": t.as_dict()})
 
 
+# Editable fields after which progress and blocking state are re-derived.
+_STATE_AFFECTING = {"week"}
+
+
 @app.route("/api/tasks/<int:task_id>/edit", methods=["POST"])
 def api_edit_task(task_id: int):
-    t = Task.query.get_or_404(task_id)
+    t = db.get_or_404(Task, task_id)
     data = request.get_json(force=True, silent=True) or {}
     if "title" in data:
         t.title = (data["title"] or "").strip()
@@ -367,28 +535,42 @@ def api_edit_task(task_id: int):
     if "week" in data:
         t.week = int(data["week"])
         set_dates_for_week(t, DEFAULT_START_DATE)
-    t.progress = compute_task_progress(t)
-    enforce_blocking_status(t)
+    if not _STATE_AFFECTING.isdisjoint(data):
+        t.progress = compute_task_progress(t)
+        enforce_blocking_status(t)
     db.session.commit()
     return jsonify({"ok": True, "task": t.as_dict()})
 
 
 @app.route("/api/tasks/<int:task_id>/delete", methods=["POST"])
 def api_delete_task(task_id: int):
-    t = Task.query.get_or_404(task_id)
-    deps = Dependency.query.filter_by(depends_on_id=task_id).all()
-    dep_task_ids = [d.task_id for d in deps]
-    for d in deps:
-        db.session.delete(d)
-    Dependency.query.filter_by(task_id=task_id).delete()
-    Subtask.query.filter_by(task_id=task_id).delete()
+    # Load the children so the ORM deletes them too; databases created before
+    # the ON DELETE CASCADE foreign keys would otherwise fail the FK check.
+    t = (
+        Task.query.options(
+            selectinload(Task.subtasks),
+            selectinload(Task.dependencies),
+            selectinload(Task.dependents),
+        )
+        .filter_by(id=task_id)
+        .first_or_404()
+    )
+    dep_task_ids = [d.task_id for d in t.dependents]
     db.session.delete(t)
-    db.session.commit()
-    for dep_task_id in dep_task_ids:
-        dt = Task.query.get(dep_task_id)
-        if dt:
-            dt.progress = compute_task_progress(dt)
-            enforce_blocking_status(dt)
+    db.session.flush()
+    g.pop("_blk_cache", None)
+    if dep_task_ids:
+        dependents = (
+            Task.query.options(
+                selectinload(Task.subtasks), selectinload(Task.dependencies)
+            )
+            .filter(Task.id.in_(dep_task_ids))
+            .all()
+        )
+        prereq_done = loaded_prereq_done(dependents)
+        for dt in dependents:
+            dt.progress = subtask_progress(dt)
+            enforce_blocking_status(dt, prereq_done)
     db.session.commit()
     return jsonify({"ok": True})
 
@@ -400,19 +582,19 @@ def api_create_subtask():
     title = (data.get("title") or "").strip()
     if not task_id or not title:
         abort(400, description="task_id and title are required")
-    t = Task.query.get_or_404(task_id)
+    t = db.get_or_404(Task, task_id)
     st = Subtask()
     st.task_id = t.id
     st.title = title
     st.done = False
     db.session.add(st)
-    db.session.commit()
+    db.session.flush()
     t.progress = compute_task_progress(t)
     if t.status == "done" and t.progress < 100.0:
         t.status = "in_progress"
         t.completed_at = None
     if t.progress > 0.0 and not t.started_at:
-        t.started_at = date.today()
+        t.started_at = _today()
     enforce_blocking_status(t)
     db.session.commit()
     return jsonify({"ok": True, "subtask": st.as_dict()})
@@ -420,59 +602,59 @@ def api_create_subtask():
 
 @app.route("/api/subtasks/<int:subtask_id>/toggle", methods=["POST"])
 def api_toggle_subtask(subtask_id: int):
-    st = Subtask.query.get_or_404(subtask_id)
-    t = Task.query.get(st.task_id)
+    st = db.get_or_404(Subtask, subtask_id)
+    t = db.session.get(Task, st.task_id)
     if t is None:
         abort(404, description="Parent task not found")
     if has_blocking_dependencies(t):
         abort(400, description="Task is blocked by dependencies; cannot toggle subtasks")
+    old_status = t.status
     st.done = not st.done
-    db.session.commit()
-    t = Task.query.get(st.task_id)
+    db.session.flush()
     t.progress = compute_task_progress(t)
     if t.progress == 100.0 and not has_blocking_dependencies(t):
         t.status = "done"
         if not t.completed_at:
-            t.completed_at = date.today()
+            t.completed_at = _today()
         if not t.started_at:
-            t.started_at = date.today()
+            t.started_at = _today()
     elif t.progress > 0.0 and t.status != "done":
         t.status = "in_progress"
         if not t.started_at:
-            t.started_at = date.today()
+            t.started_at = _today()
         t.completed_at = None
     else:
         if not has_blocking_dependencies(t):
             t.status = "todo"
             t.completed_at = None
     enforce_blocking_status(t)
+    update_dependents_status(t.id, old_status, t.status)
     db.session.commit()
-    update_dependents_status(t.id)
     return jsonify({"ok": True, "subtask": st.as_dict(), "task": t.as_dict()})
 
 
 @app.route("/api/subtasks/<int:subtask_id>/delete", methods=["POST"])
 def api_delete_subtask(subtask_id: int):
-    st = Subtask.query.get_or_404(subtask_id)
-    t = Task.query.get(st.task_id)
+    st = db.get_or_404(Subtask, subtask_id)
+    t = db.session.get(Task, st.task_id)
     if t and has_blocking_dependencies(t):
         abort(400, description="Task is blocked by dependencies; cannot delete subtask")
     db.session.delete(st)
-    db.session.commit()
+    db.session.flush()
     if t:
         t.progress = compute_task_progress(t)
         if t.progress == 100.0 and not has_blocking_dependencies(t):
             t.status = "done"
             if not t.completed_at:
-                t.completed_at = date.today()
+                t.completed_at = _today()
         else:
             if t.status == "done" and t.progress < 100.0:
                 t.status = "in_progress" if t.progress > 0 else "todo"
                 t.completed_at = None
             if t.progress > 0 and not t.started_at:
-                t.started_at = date.today()
+                t.started_at = _today()
         enforce_blocking_status(t)
-        db.session.commit()
+    db.session.commit()
     return jsonify({"ok": True, "task": t.as_dict() if t else None})
 
 
@@ -483,6 +665,8 @@ def api_add_dependency():
     depends_on_id = int(data.get("depends_on_id") or 0)
     if not task_id or not depends_on_id or task_id == depends_on_id:
         abort(400, description="invalid dependency")
+    t = db.get_or_404(Task, task_id)
+    db.get_or_404(Task, depends_on_id)
     exists = Dependency.query.filter_by(
         task_id=task_id, depends_on_id=depends_on_id
     ).first()
@@ -492,8 +676,8 @@ def api_add_dependency():
     dep.task_id = task_id
     dep.depends_on_id = depends_on_id
     db.session.add(dep)
-    db.session.commit()
-    t = Task.query.get_or_404(task_id)
+    db.session.flush()
+    g.pop("_blk_cache", None)
     enforce_blocking_status(t)
     db.session.commit()
     return jsonify({"ok": True, "dependency": dep.as_dict()})
@@ -501,11 +685,12 @@ def api_add_dependency():
 
 @app.route("/api/dependencies/<int:dep_id>/delete", methods=["POST"])
 def api_delete_dependency(dep_id: int):
-    dep = Dependency.query.get_or_404(dep_id)
+    dep = db.get_or_404(Dependency, dep_id)
     task_id = dep.task_id
     db.session.delete(dep)
-    db.session.commit()
-    t = Task.query.get(task_id)
+    db.session.flush()
+    g.pop("_blk_cache", None)
+    t = db.session.get(Task, task_id)
     enforce_blocking_status(t)
     db.session.commit()
     return jsonify({"ok": True})
@@ -513,18 +698,17 @@ def api_delete_dependency(dep_id: int):
 
 @app.route("/api/graph")
 def api_graph():
-    tasks = Task.query.all()
+    node_rows = db.session.execute(
+        select(Task.id, Task.title, Task.status, Task.week)
+    ).all()
+    link_rows = db.session.execute(
+        select(Dependency.depends_on_id, Dependency.task_id)
+    ).all()
     nodes = [
-        {
-            "id": t.id,
-            "title": t.title,
-            "status": t.status,
-            "week": t.week,
-        }
-        for t in tasks
+        {"id": r[0], "title": r[1], "status": r[2], "week": r[3]}
+        for r in node_rows
     ]
-    deps = Dependency.query.all()
-    links = [{"source": d.depends_on_id, "target": d.task_id} for d in deps]
+    links = [{"source": r[0], "target": r[1]} for r in link_rows]
     return jsonify({"nodes": nodes, "links": links})
 
 
@@ -539,61 +723,83 @@ def db_init():
 @app.cli.command("db-migrate")
 def db_migrate():
     """Ensure optional columns exist (non-destructive)."""
-    _ensure_sqlite_columns()
+    _ensure_sqlite_columns(force=True)
     print("DB migrated (columns ensured):", DB_PATH)
 
 
 @app.cli.command("db-seed")
 def db_seed():
     """Seed 24-week plan."""
+    import graphlib
     import json
 
-    db.create_all()
-    _ensure_sqlite_columns()
     seed_path = os.path.join(BASE_DIR, "seeds", "tasks_seed.json")
     with open(seed_path, "r", encoding="utf-8") as f:
         payload = json.load(f)
 
-    Dependency.query.delete()
-    Subtask.query.delete()
-    Task.query.delete()
-    db.session.commit()
+    items = payload.get("tasks", [])
+    # Prerequisites come before their dependents; a cycle fails here, before
+    # anything is wiped.
+    order = list(
+        graphlib.TopologicalSorter(
+            {item["key"]: item.get("depends_on", []) for item in items}
+        ).static_order()
+    )
 
-    id_map: Dict[str, int] = {}
-    for item in payload.get("tasks", []):
-        t = Task()
-        t.title = item["title"]
-        t.description = item.get("description", "")
-        t.status = item.get("status", "todo")
-        t.priority = item.get("priority", 2)
-        t.week = item.get("week", 0)
-        t.slug = slugify(t.title)
-        set_dates_for_week(t, DEFAULT_START_DATE)
-        db.session.add(t)
-        db.session.flush()
-        id_map[item["key"]] = t.id
-        for st_title in item.get("subtasks", []):
-            st = Subtask()
-            st.task_id = t.id
-            st.title = st_title
-            st.done = False
-            db.session.add(st)
+    # Rebuilding the tables wipes them and picks up the ON DELETE CASCADE
+    # foreign keys on databases created before they were declared.
+    db.drop_all()
+    db.create_all()
 
-    db.session.commit()
+    task_rows: List[Dict] = []
+    slug_by_key: Dict[str, str] = {}
+    for item in items:
+        slug = slugify(item["title"])
+        slug_by_key[item["key"]] = slug
+        week = item.get("week", 0)
+        start_date, end_date = week_dates(week, DEFAULT_START_DATE) or (None, None)
+        task_rows.append(
+            {
+                "slug": slug,
+                "title": item["title"],
+                "description": item.get("description", ""),
+                "status": item.get("status", "todo"),
+                "priority": item.get("priority", 2),
+                "week": week,
+                "start_date": start_date,
+                "end_date": end_date,
+            }
+        )
+    db.session.bulk_insert_mappings(Task, task_rows)
+
+    id_by_slug = dict(db.session.execute(select(Task.slug, Task.id)).all())
+    id_map: Dict[str, int] = {k: id_by_slug[v] for k, v in slug_by_key.items()}
 
-    for item in payload.get("tasks", []):
+    subtask_rows: List[Dict] = []
+    dependency_rows: List[Dict] = []
+    for item in items:
         src = id_map[item["key"]]
+        for st_title in item.get("subtasks", []):
+            subtask_rows.append({"task_id": src, "title": st_title, "done": False})
         for dep_key in item.get("depends_on", []):
-            dep = Dependency()
-            dep.task_id = src
-            dep.depends_on_id = id_map[dep_key]
-            db.session.add(dep)
-
-    db.session.commit()
-
-    for t in Task.query.all():
-        t.progress = compute_task_progress(t)
-        enforce_blocking_status(t)
+            dependency_rows.append(
+                {"task_id": src, "depends_on_id": id_map[dep_key]}
+            )
+    db.session.bulk_insert_mappings(Subtask, subtask_rows)
+    db.session.bulk_insert_mappings(Dependency, dependency_rows)
+
+    tasks_by_id = {
+        t.id: t
+        for t in Task.query.options(
+            selectinload(Task.subtasks), selectinload(Task.dependencies)
+        ).all()
+    }
+    for key in order:
+        t = tasks_by_id[id_map[key]]
+        t.progress = subtask_progress(t)
+        enforce_blocking_status(
+            t, lambda dep_id: tasks_by_id[dep_id].status == "done"
+        )
     db.session.commit()
 
     print("Seeded", len(id_map), "tasks.")